@@ -14,10 +14,10 @@ T = TypeVar("T")
 
 
 def _next_delay(base_delay: float, max_delay: float, attempt: int, jitter: float) -> float:
-    delay = min(max_delay, base_delay * (2**attempt))
+    cap = min(max_delay, base_delay * (1 << attempt))
     if jitter:
-        delay *= 1 + random.uniform(-jitter, jitter)
-    return max(0.0, delay)
+        cap *= 1 - jitter * random.random()
+    return max(0.0, cap)
 
 
 async def run_with_backoff(
@@ -26,9 +26,13 @@ async def run_with_backoff(
     max_retries: int = 5,
     base_delay: float = 0.5,
     max_delay: float = 10.0,
-    jitter: float = 0.1,
+    jitter: float = 1.0,
 ) -> T:
-    """Run an async operation with exponential backoff on RateLimitError."""
+    """Run an async operation with exponential backoff on RateLimitError.
+
+    ``jitter`` is the fraction of each capped delay that is randomised; the
+    default of 1.0 is "full jitter", sleeping uniformly in ``[0, cap]``.
+    """
     for attempt in range(max_retries + 1):
         try:
             return await operation()
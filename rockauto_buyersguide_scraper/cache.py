@@ -1,92 +1,183 @@
 from __future__ import annotations
 
+import atexit
+import importlib
+import importlib.util
 import json
 import os
 import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Tuple
+
+
+_orjson = importlib.import_module("orjson") if importlib.util.find_spec("orjson") else None
 
 
 @dataclass(frozen=True)
 class CacheEntry:
-    value: str
+    value: bytes
     fetched_at: float
 
 
+CacheRow = Tuple[str, str, str, bytes, float]
+MemoryKey = Tuple[str, str, str]
+
+DEFAULT_MEMORY_ENTRIES = 50_000
+
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA busy_timeout=3000",
+)
+
+
+_UPSERT_SQL = """
+    INSERT INTO cache_entries (part_number, part_type, cache_kind, value, fetched_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(part_number, part_type, cache_kind)
+    DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at
+"""
+
+
 class CacheStore:
-    def __init__(self, cache_dir: Path, ttl_seconds: int) -> None:
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: int,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ) -> None:
         self.cache_dir = cache_dir
         self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
         self.db_path = self.cache_dir / "cache.sqlite3"
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[MemoryKey, CacheEntry]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
         self._ensure_db()
+        atexit.register(self.close)
 
     def _ensure_db(self) -> None:
         os.makedirs(self.cache_dir, exist_ok=True)
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute(
-                """
-                CREATE TABLE IF NOT EXISTS cache_entries (
-                    part_number TEXT NOT NULL,
-                    part_type TEXT NOT NULL,
-                    cache_kind TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    fetched_at REAL NOT NULL,
-                    PRIMARY KEY (part_number, part_type, cache_kind)
-                )
-                """
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for pragma in _CONNECTION_PRAGMAS:
+            self._conn.execute(pragma)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                part_number TEXT NOT NULL,
+                part_type TEXT NOT NULL,
+                cache_kind TEXT NOT NULL,
+                value BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (part_number, part_type, cache_kind)
             )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_fetched_at ON cache_entries(fetched_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("CacheStore is closed.")
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        atexit.unregister(self.close)
 
     def get(self, part_number: str, part_type: str, cache_kind: str) -> Optional[CacheEntry]:
-        with sqlite3.connect(self.db_path) as connection:
-            row = connection.execute(
+        # A tuple key reuses the cached hashes of its (often interned) strings.
+        key = (part_number, part_type, cache_kind)
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if entry.fetched_at >= cutoff:
+                    self._mem.move_to_end(key)
+                    return entry
+                del self._mem[key]
+            row = self._connection().execute(
                 """
                 SELECT value, fetched_at
                 FROM cache_entries
                 WHERE part_number = ? AND part_type = ? AND cache_kind = ?
+                    AND fetched_at >= ?
                 """,
-                (part_number, part_type, cache_kind),
+                (part_number, part_type, cache_kind, cutoff),
             ).fetchone()
-        if row is None:
-            return None
-        value, fetched_at = row
-        if self._is_expired(fetched_at):
-            self.delete(part_number, part_type, cache_kind)
-            return None
-        return CacheEntry(value=value, fetched_at=fetched_at)
-
-    def set(self, part_number: str, part_type: str, cache_kind: str, value: str) -> None:
+            if row is None:
+                return None
+            value, fetched_at = row
+            if isinstance(value, str):
+                value = value.encode("utf-8")
+            entry = CacheEntry(value=value, fetched_at=fetched_at)
+            self._remember(key, entry)
+        return entry
+
+    def set(self, part_number: str, part_type: str, cache_kind: str, value: bytes) -> None:
         fetched_at = time.time()
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute(
-                """
-                INSERT INTO cache_entries (part_number, part_type, cache_kind, value, fetched_at)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(part_number, part_type, cache_kind)
-                DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at
-                """,
-                (part_number, part_type, cache_kind, value, fetched_at),
+        with self._lock:
+            self._connection().execute(
+                _UPSERT_SQL, (part_number, part_type, cache_kind, value, fetched_at)
+            )
+            self._remember(
+                (part_number, part_type, cache_kind),
+                CacheEntry(value=value, fetched_at=fetched_at),
             )
 
+    def set_many(self, rows: Iterable[CacheRow]) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            connection = self._connection()
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(_UPSERT_SQL, rows)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            for part_number, part_type, cache_kind, value, fetched_at in rows:
+                self._remember(
+                    (part_number, part_type, cache_kind),
+                    CacheEntry(value=value, fetched_at=fetched_at),
+                )
+
     def delete(self, part_number: str, part_type: str, cache_kind: str) -> None:
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute(
+        with self._lock:
+            self._connection().execute(
                 """
                 DELETE FROM cache_entries
                 WHERE part_number = ? AND part_type = ? AND cache_kind = ?
                 """,
                 (part_number, part_type, cache_kind),
             )
+            self._mem.pop((part_number, part_type, cache_kind), None)
 
     def clear(self) -> None:
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute("DELETE FROM cache_entries")
+        with self._lock:
+            self._connection().execute("DELETE FROM cache_entries")
+            self._mem.clear()
 
     def prune_expired(self) -> int:
         cutoff = time.time() - self.ttl_seconds
-        with sqlite3.connect(self.db_path) as connection:
-            cursor = connection.execute(
+        with self._lock:
+            cursor = self._connection().execute(
                 """
                 DELETE FROM cache_entries
                 WHERE fetched_at < ?
@@ -95,13 +186,22 @@ class CacheStore:
             )
             return cursor.rowcount
 
-    def _is_expired(self, fetched_at: float) -> bool:
-        return time.time() - fetched_at > self.ttl_seconds
+    def _remember(self, key: MemoryKey, entry: CacheEntry) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_entries:
+            self._mem.popitem(last=False)
 
 
-def serialize_json(value: Any) -> str:
-    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+def serialize_json(value: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(value, option=_orjson.OPT_SORT_KEYS)
+    return json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8")
 
 
-def deserialize_json(payload: str) -> Any:
+def deserialize_json(payload: bytes) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(payload)
     return json.loads(payload)
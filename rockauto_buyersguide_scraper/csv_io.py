@@ -2,28 +2,49 @@
 from __future__ import annotations
 
 import csv
+from dataclasses import dataclass
+from itertools import chain, islice, repeat
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List, Sequence
 
+IO_BUFFER_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class CsvBatch:
+    rows: List[Dict[str, str]]
+    end_offset: int
+    fieldnames: List[str]
+
 
 def read_csv_in_batches(
     input_path: Path,
     *,
     batch_size: int,
     skip_rows: int = 0,
-) -> Iterator[List[Dict[str, str]]]:
-    with input_path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        batch: List[Dict[str, str]] = []
-        for index, row in enumerate(reader):
-            if index < skip_rows:
-                continue
-            batch.append(row)
-            if len(batch) >= batch_size:
-                yield batch
-                batch = []
-        if batch:
-            yield batch
+    start_offset: int = 0,
+) -> Iterator[CsvBatch]:
+    with input_path.open("rb", buffering=IO_BUFFER_SIZE) as handle:
+        # Lines are pulled from the binary handle one at a time, so tell()
+        # always points just past the last line the csv reader consumed.
+        reader = csv.reader(map(bytes.decode, handle))
+        header = next(reader, [])
+        if start_offset > handle.tell():
+            handle.seek(start_offset)
+        # Blank lines are dropped and rows are zipped into dicts by C-level
+        # iterators; islice never pulls past the end of a batch. Short rows are
+        # padded with "" (from one shared, endless repeat) so every dict has
+        # all header keys; that matches what the old DictReader + DictWriter
+        # pair wrote for missing cells.
+        padded = map(chain, filter(None, reader), repeat(repeat("")))
+        rows = map(dict, map(zip, repeat(header), padded))
+        if skip_rows:
+            next(islice(rows, skip_rows, skip_rows), None)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield CsvBatch(rows=batch, end_offset=handle.tell(), fieldnames=header)
 
 
 def ensure_output_schema(
@@ -32,17 +53,60 @@ def ensure_output_schema(
     extra_fields: Sequence[str],
 ) -> List[str]:
     fieldnames = list(input_fieldnames) + list(extra_fields)
+    existing_header: List[str] = []
     if output_path.exists():
         with output_path.open(newline="", encoding="utf-8") as handle:
-            reader = csv.reader(handle)
-            existing_header = next(reader, [])
-        if existing_header:
-            merged_header = list(existing_header)
-            merged_header.extend(
-                name for name in fieldnames if name not in existing_header
-            )
-            return merged_header
-    return fieldnames
+            existing_header = next(csv.reader(handle), [])
+    if not existing_header:
+        with output_path.open("w", newline="", encoding="utf-8") as handle:
+            csv.writer(handle).writerow(fieldnames)
+        return fieldnames
+
+    merged_header = list(existing_header)
+    merged_header.extend(name for name in fieldnames if name not in existing_header)
+    if merged_header != existing_header:
+        _rewrite_with_header(output_path, merged_header)
+    return merged_header
+
+
+def _rewrite_with_header(output_path: Path, fieldnames: Sequence[str]) -> None:
+    temp_path = output_path.with_suffix(f"{output_path.suffix}.tmp")
+    with output_path.open(newline="", encoding="utf-8") as handle, temp_path.open(
+        "w", newline="", encoding="utf-8"
+    ) as temp_handle:
+        reader = csv.DictReader(handle)
+        writer = csv.DictWriter(temp_handle, fieldnames=list(fieldnames))
+        writer.writeheader()
+        for row in reader:
+            writer.writerow(row)
+    temp_path.replace(output_path)
+
+
+class CsvAppender:
+    """Append rows to a CSV through one handle kept open for its lifetime."""
+
+    def __init__(self, output_path: Path, fieldnames: Sequence[str]) -> None:
+        self._columns = list(fieldnames)
+        self._handle = output_path.open(
+            "a", buffering=IO_BUFFER_SIZE, newline="", encoding="utf-8"
+        )
+        self._writer = csv.writer(self._handle)
+
+    def write_rows(self, rows: Iterable[Dict[str, str]]) -> None:
+        columns = self._columns
+        self._writer.writerows([row.get(column, "") for column in columns] for row in rows)
+
+    def flush(self) -> None:
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "CsvAppender":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
 
 def append_rows(
@@ -50,24 +114,5 @@ def append_rows(
     fieldnames: Sequence[str],
     rows: Iterable[Dict[str, str]],
 ) -> None:
-    resolved_fieldnames = list(fieldnames)
-    is_new_file = not output_path.exists()
-    if not is_new_file:
-        with output_path.open(newline="", encoding="utf-8") as handle:
-            reader = csv.DictReader(handle)
-            existing_header = reader.fieldnames or []
-            if existing_header != resolved_fieldnames:
-                existing_rows = list(reader)
-                temp_path = output_path.with_suffix(f"{output_path.suffix}.tmp")
-                with temp_path.open("w", newline="", encoding="utf-8") as temp_handle:
-                    writer = csv.DictWriter(temp_handle, fieldnames=resolved_fieldnames)
-                    writer.writeheader()
-                    for row in existing_rows:
-                        writer.writerow(row)
-                temp_path.replace(output_path)
-    with output_path.open("a", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=resolved_fieldnames)
-        if is_new_file:
-            writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+    with CsvAppender(output_path, fieldnames) as appender:
+        appender.write_rows(rows)
@@ -22,7 +22,7 @@ async def fetch_http_data(
     max_retries: int = 5,
     base_delay: float = 0.5,
     max_delay: float = 10.0,
-    jitter: float = 0.1,
+    jitter: float = 1.0,
 ) -> Dict[str, Any]:
     if not target:
         return {"status": "skipped", "data": ""}
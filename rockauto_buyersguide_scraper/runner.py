@@ -3,16 +3,37 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
+import importlib
+import importlib.util
+import os
+import shutil
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
-
-from .csv_io import append_rows, ensure_output_schema, read_csv_in_batches
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .cache import (
+    DEFAULT_MEMORY_ENTRIES,
+    CacheRow,
+    CacheStore,
+    deserialize_json,
+    serialize_json,
+)
+from .csv_io import CsvAppender, ensure_output_schema, read_csv_in_batches
 from .http_client import fetch_http_data
 from .ui_automation import fetch_ui_data
-from src.cache import CacheStore
 
 
 EXTRA_FIELDS = [
@@ -24,8 +45,23 @@ EXTRA_FIELDS = [
     "ui_cache_hit",
 ]
 
+HTTP_TARGET_FIELDS = ("http_url", "url")
+UI_TARGET_FIELDS = ("ui_query", "query")
+
 DEFAULT_CACHE_TTL_SECONDS = 60 * 60 * 24
-URL_CACHE_SENTINEL = "__url__"
+URL_CACHE_SENTINEL = sys.intern("__url__")
+DEFAULT_SNAPSHOT_EVERY = 1000
+DEFAULT_CHECKPOINT_EVERY = 5
+
+
+TargetGetter = Callable[[Dict[str, str]], Optional[str]]
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {number}")
+    return number
 
 
 @dataclass
@@ -34,24 +70,27 @@ class Checkpoint:
     output_csv: str
     last_row_index: int
     updated_at: float
+    byte_offset: Optional[int] = None
 
 
 class CheckpointManager:
-    def __init__(self, directory: Path) -> None:
+    def __init__(self, directory: Path, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY) -> None:
         self.directory = directory
         self.directory.mkdir(parents=True, exist_ok=True)
         self.latest_path = self.directory / "latest.json"
+        self.snapshot_every = snapshot_every
+        self._last_snapshot_bucket: Optional[int] = None
 
     def load(self) -> Optional[Checkpoint]:
         if not self.latest_path.exists():
             return None
-        with self.latest_path.open(encoding="utf-8") as handle:
-            data = json.load(handle)
+        data = deserialize_json(self.latest_path.read_bytes())
         return Checkpoint(
             input_csv=data["input_csv"],
             output_csv=data["output_csv"],
             last_row_index=data["last_row_index"],
             updated_at=data["updated_at"],
+            byte_offset=data.get("byte_offset"),
         )
 
     def save(self, checkpoint: Checkpoint) -> None:
@@ -60,169 +99,237 @@ class CheckpointManager:
             "output_csv": checkpoint.output_csv,
             "last_row_index": checkpoint.last_row_index,
             "updated_at": checkpoint.updated_at,
+            "byte_offset": checkpoint.byte_offset,
         }
-        checkpoint_path = self.directory / f"checkpoint_{checkpoint.last_row_index}.json"
-        with checkpoint_path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2)
-        with self.latest_path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2)
-
-
-def _extract_http_target(row: Dict[str, str]) -> Optional[str]:
-    return row.get("http_url") or row.get("url") or None
-
+        serialized = serialize_json(payload)
+        temp_path = self.latest_path.with_suffix(".json.tmp")
+        with temp_path.open("wb") as handle:
+            handle.write(serialized)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self.latest_path)
+
+        bucket = (checkpoint.last_row_index + 1) // self.snapshot_every
+        if bucket != self._last_snapshot_bucket:
+            self._last_snapshot_bucket = bucket
+            checkpoint_path = self.directory / f"checkpoint_{checkpoint.last_row_index}.json"
+            # latest.json is always replaced rather than rewritten, so a hard
+            # link keeps this snapshot stable without a second write.
+            try:
+                os.link(self.latest_path, checkpoint_path)
+            except OSError:
+                shutil.copyfile(self.latest_path, checkpoint_path)
+
+
+def _build_target_getter(
+    fieldnames: Sequence[str], candidates: Sequence[str]
+) -> TargetGetter:
+    present = [name for name in candidates if name in fieldnames]
+    if not present:
+        return lambda row: None
+    if len(present) == 1:
+        (key,) = present
+        return lambda row: row.get(key) or None
+    primary, *fallbacks = present
+
+    def get_target(row: Dict[str, str]) -> Optional[str]:
+        value = row.get(primary)
+        if value:
+            return value
+        for key in fallbacks:
+            value = row.get(key)
+            if value:
+                return value
+        return None
 
-def _extract_ui_target(row: Dict[str, str]) -> Optional[str]:
-    return row.get("ui_query") or row.get("query") or None
+    return get_target
 
 
-def _extract_part_number(row: Dict[str, str]) -> str:
-    for key in ("part_number", "input_part_number", "skp_number", "interchange_number"):
-        value = row.get(key)
-        if value:
-            return value
-    return ""
+def _as_bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
 
 
-def _extract_part_type(row: Dict[str, str]) -> str:
-    return row.get("part_type", "")
+def _as_text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
 
 
-def _cache_lookup(
-    cache: Optional[CacheStore],
-    *,
-    part_number: str,
-    part_type: str,
-    cache_kind: str,
-) -> Optional[str]:
+def _cache_lookup(cache: Optional[CacheStore], *, cache_kind: str) -> Optional[bytes]:
     if cache is None:
         return None
-    if cache_kind.startswith(("http:", "ui:")):
-        part_number = URL_CACHE_SENTINEL
-        part_type = URL_CACHE_SENTINEL
-    cached = cache.get(part_number or cache_kind, part_type or "unknown", cache_kind)
+    cached = cache.get(URL_CACHE_SENTINEL, URL_CACHE_SENTINEL, cache_kind)
     if cached is None:
         return None
     return cached.value
 
 
 def _cache_store(
-    cache: Optional[CacheStore],
+    pending: Optional[List[CacheRow]],
     *,
-    part_number: str,
-    part_type: str,
     cache_kind: str,
-    value: str,
+    value: bytes,
 ) -> None:
-    if cache is None:
+    if pending is None:
         return
-    if cache_kind.startswith(("http:", "ui:")):
-        part_number = URL_CACHE_SENTINEL
-        part_type = URL_CACHE_SENTINEL
-    cache.set(part_number or cache_kind, part_type or "unknown", cache_kind, value)
+    pending.append((URL_CACHE_SENTINEL, URL_CACHE_SENTINEL, cache_kind, value, time.time()))
+
+
+def _http_cache_kind(target: Optional[str]) -> str:
+    return sys.intern(f"http:{target}" if target else "http:missing")
+
+
+def _ui_cache_kind(target: Optional[str]) -> str:
+    return sys.intern(f"ui:{target}" if target else "ui:missing")
+
+
+def _cached_http_result(value: bytes) -> Dict[str, str]:
+    return {
+        "http_status": "cached",
+        "http_data": _as_text(value),
+        "http_cache_hit": "true",
+    }
+
+
+def _cached_ui_result(value: bytes) -> Dict[str, str]:
+    return {
+        "ui_status": "cached",
+        "ui_data": _as_text(value),
+        "ui_cache_hit": "true",
+    }
 
 
 async def _bounded_fetch_http(
-    row: Dict[str, str],
+    target: Optional[str],
+    cache_kind: str,
     semaphore: asyncio.Semaphore,
-    cache: Optional[CacheStore],
+    pending: Optional[List[CacheRow]],
 ) -> Dict[str, str]:
-    target = _extract_http_target(row)
-    part_number = _extract_part_number(row)
-    part_type = _extract_part_type(row)
-
-    cached_value = _cache_lookup(
-        cache,
-        part_number=part_number,
-        part_type=part_type,
-        cache_kind=f"http:{target}" if target else "http:missing",
-    )
-    if cached_value is not None:
-        return {
-            "http_status": "cached",
-            "http_data": cached_value,
-            "http_cache_hit": "true",
-        }
-
     async with semaphore:
         result = await fetch_http_data(target)
-    _cache_store(
-        cache,
-        part_number=part_number,
-        part_type=part_type,
-        cache_kind=f"http:{target}" if target else "http:missing",
-        value=str(result.get("data", "")),
-    )
+    data = result.get("data", b"")
+    _cache_store(pending, cache_kind=cache_kind, value=_as_bytes(data))
     return {
         "http_status": str(result.get("status", "")),
-        "http_data": str(result.get("data", "")),
+        "http_data": _as_text(data),
         "http_cache_hit": "false",
     }
 
 
 async def _bounded_fetch_ui(
-    row: Dict[str, str],
+    target: Optional[str],
+    cache_kind: str,
     semaphore: asyncio.Semaphore,
-    cache: Optional[CacheStore],
+    pending: Optional[List[CacheRow]],
 ) -> Dict[str, str]:
-    target = _extract_ui_target(row)
-    part_number = _extract_part_number(row)
-    part_type = _extract_part_type(row)
-
-    cached_value = _cache_lookup(
-        cache,
-        part_number=part_number,
-        part_type=part_type,
-        cache_kind=f"ui:{target}" if target else "ui:missing",
-    )
-    if cached_value is not None:
-        return {
-            "ui_status": "cached",
-            "ui_data": cached_value,
-            "ui_cache_hit": "true",
-        }
-
     async with semaphore:
         result = await fetch_ui_data(target)
-    _cache_store(
-        cache,
-        part_number=part_number,
-        part_type=part_type,
-        cache_kind=f"ui:{target}" if target else "ui:missing",
-        value=str(result.get("data", "")),
-    )
+    data = result.get("data", b"")
+    _cache_store(pending, cache_kind=cache_kind, value=_as_bytes(data))
     return {
         "ui_status": str(result.get("status", "")),
-        "ui_data": str(result.get("data", "")),
+        "ui_data": _as_text(data),
         "ui_cache_hit": "false",
     }
 
 
+FetchResults = Dict[Optional[str], Dict[str, str]]
+
+FetchJob = Tuple[
+    FetchResults,
+    Callable[
+        [Optional[str], str, asyncio.Semaphore, Optional[List[CacheRow]]],
+        Awaitable[Dict[str, str]],
+    ],
+    Optional[str],
+    str,
+    asyncio.Semaphore,
+]
+
+
 async def _process_batch(
     rows: List[Dict[str, str]],
     *,
-    max_concurrency: int,
+    http_semaphore: asyncio.Semaphore,
+    ui_semaphore: asyncio.Semaphore,
     cache: Optional[CacheStore],
+    workers: int,
+    http_target: TargetGetter,
+    ui_target: TargetGetter,
 ) -> List[Dict[str, str]]:
-    http_semaphore = asyncio.Semaphore(max_concurrency)
-    ui_semaphore = asyncio.Semaphore(max_concurrency)
-
-    http_tasks = [
-        asyncio.create_task(_bounded_fetch_http(row, http_semaphore, cache)) for row in rows
-    ]
-    ui_tasks = [asyncio.create_task(_bounded_fetch_ui(row, ui_semaphore, cache)) for row in rows]
+    pending: Optional[List[CacheRow]] = [] if cache is not None else None
+    # Each distinct target is fetched once per batch, and the batch's cache
+    # writes land before the next batch starts, so duplicate rows never have
+    # two fetches in flight for the same key.
+    http_targets = [http_target(row) for row in rows]
+    ui_targets = [ui_target(row) for row in rows]
+    http_by_target: FetchResults = {}
+    ui_by_target: FetchResults = {}
+
+    # Cache hits are resolved here; only misses are queued for the workers.
+    jobs: "asyncio.Queue[FetchJob]" = asyncio.Queue()
+    for target in dict.fromkeys(http_targets):
+        cache_kind = _http_cache_kind(target)
+        cached_value = _cache_lookup(cache, cache_kind=cache_kind)
+        if cached_value is not None:
+            http_by_target[target] = _cached_http_result(cached_value)
+        else:
+            jobs.put_nowait(
+                (http_by_target, _bounded_fetch_http, target, cache_kind, http_semaphore)
+            )
+    for target in dict.fromkeys(ui_targets):
+        cache_kind = _ui_cache_kind(target)
+        cached_value = _cache_lookup(cache, cache_kind=cache_kind)
+        if cached_value is not None:
+            ui_by_target[target] = _cached_ui_result(cached_value)
+        else:
+            jobs.put_nowait((ui_by_target, _bounded_fetch_ui, target, cache_kind, ui_semaphore))
+
+    async def worker() -> None:
+        while True:
+            try:
+                results, fetch, target, cache_kind, semaphore = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[target] = await fetch(target, cache_kind, semaphore, pending)
+
+    if not jobs.empty():
+        await asyncio.gather(*(worker() for _ in range(min(workers, jobs.qsize()))))
+    if cache is not None and pending:
+        await asyncio.to_thread(cache.set_many, pending)
+
+    # Rows are owned by this batch (read_csv_in_batches builds fresh dicts), so
+    # the fetch results are merged into them in place and the same list is
+    # returned.
+    for row, http_key, ui_key in zip(rows, http_targets, ui_targets):
+        row.update(http_by_target[http_key])
+        row.update(ui_by_target[ui_key])
+    return rows
+
+
+def _save_checkpoint(
+    checkpoint_manager: CheckpointManager,
+    appender: CsvAppender,
+    checkpoint: Checkpoint,
+) -> None:
+    appender.flush()
+    checkpoint_manager.save(checkpoint)
 
-    http_results = await asyncio.gather(*http_tasks)
-    ui_results = await asyncio.gather(*ui_tasks)
 
-    combined: List[Dict[str, str]] = []
-    for row, http_result, ui_result in zip(rows, http_results, ui_results):
-        combined_row = {**row, **http_result, **ui_result}
-        combined.append(combined_row)
-    return combined
+def _write_batch(
+    checkpoint_manager: CheckpointManager,
+    appender: CsvAppender,
+    rows: List[Dict[str, str]],
+    checkpoint: Optional[Checkpoint],
+) -> None:
+    appender.write_rows(rows)
+    if checkpoint is not None:
+        _save_checkpoint(checkpoint_manager, appender, checkpoint)
 
 
-def run(
+async def _run_async(
     *,
     input_csv: Path,
     output_csv: Path,
@@ -230,45 +337,158 @@ def run(
     max_concurrency: int,
     checkpoint_dir: Path,
     resume: bool,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
     cache_dir: Optional[Path],
     cache_ttl: int,
     cache_clear: bool,
+    cache_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
 ) -> None:
+    if checkpoint_every < 1:
+        raise ValueError(f"checkpoint_every must be >= 1, got {checkpoint_every}")
     checkpoint_manager = CheckpointManager(checkpoint_dir)
+    processed_index = -1
     skip_rows = 0
+    start_offset = 0
     if resume:
         checkpoint = checkpoint_manager.load()
         if checkpoint and checkpoint.input_csv == str(input_csv):
-            skip_rows = checkpoint.last_row_index + 1
-
-    batches = read_csv_in_batches(input_csv, batch_size=batch_size, skip_rows=skip_rows)
-    output_fieldnames: Optional[List[str]] = None
-    processed_index = skip_rows - 1
-    cache = CacheStore(cache_dir, ttl_seconds=cache_ttl) if cache_dir else None
+            processed_index = checkpoint.last_row_index
+            if checkpoint.byte_offset is not None:
+                start_offset = checkpoint.byte_offset
+            else:
+                skip_rows = checkpoint.last_row_index + 1
+
+    batches = read_csv_in_batches(
+        input_csv, batch_size=batch_size, skip_rows=skip_rows, start_offset=start_offset
+    )
+    cache = (
+        CacheStore(cache_dir, ttl_seconds=cache_ttl, memory_entries=cache_memory_entries)
+        if cache_dir
+        else None
+    )
     if cache:
-        cache.prune_expired()
+        await asyncio.to_thread(cache.prune_expired)
     if cache and cache_clear:
-        cache.clear()
+        await asyncio.to_thread(cache.clear)
+    http_semaphore = asyncio.Semaphore(max_concurrency)
+    ui_semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    # Python 3.12+: tasks whose fetch is answered from the cache finish
+    # synchronously instead of being scheduled on the loop.
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        loop.set_task_factory(eager_task_factory)
+    pending_write: Optional[asyncio.Future[None]] = None
+    unsaved_checkpoint: Optional[Checkpoint] = None
+    batch_count = 0
+
+    appender: Optional[CsvAppender] = None
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            try:
+                for csv_batch in batches:
+                    batch = csv_batch.rows
+                    if appender is None:
+                        input_fieldnames = csv_batch.fieldnames
+                        output_fieldnames = await asyncio.to_thread(
+                            ensure_output_schema, output_csv, input_fieldnames, EXTRA_FIELDS
+                        )
+                        appender = CsvAppender(output_csv, output_fieldnames)
+                        http_target = _build_target_getter(input_fieldnames, HTTP_TARGET_FIELDS)
+                        ui_target = _build_target_getter(input_fieldnames, UI_TARGET_FIELDS)
+
+                    results = await _process_batch(
+                        batch,
+                        http_semaphore=http_semaphore,
+                        ui_semaphore=ui_semaphore,
+                        cache=cache,
+                        workers=2 * max_concurrency,
+                        http_target=http_target,
+                        ui_target=ui_target,
+                    )
+                    processed_index += len(batch)
+                    checkpoint = Checkpoint(
+                        input_csv=str(input_csv),
+                        output_csv=str(output_csv),
+                        last_row_index=processed_index,
+                        updated_at=time.time(),
+                        byte_offset=csv_batch.end_offset,
+                    )
+                    batch_count += 1
+                    if batch_count % checkpoint_every == 0:
+                        unsaved_checkpoint = None
+                    else:
+                        unsaved_checkpoint, checkpoint = checkpoint, None
+                    # Keep at most one write in flight so the checkpoint never runs
+                    # ahead of the rows that have actually been appended.
+                    if pending_write is not None:
+                        await pending_write
+                    pending_write = loop.run_in_executor(
+                        writer,
+                        _write_batch,
+                        checkpoint_manager,
+                        appender,
+                        results,
+                        checkpoint,
+                    )
+            finally:
+                # Also runs when a batch fails: once the last write has landed,
+                # record it so --resume does not append those rows again. If the
+                # write itself failed, awaiting it re-raises and nothing is saved.
+                if pending_write is not None:
+                    await pending_write
+                if appender is not None and unsaved_checkpoint is not None:
+                    await loop.run_in_executor(
+                        writer, _save_checkpoint, checkpoint_manager, appender, unsaved_checkpoint
+                    )
+    finally:
+        # The executor has drained by now, so no write can race the close.
+        if appender is not None:
+            appender.close()
+
+
+def _loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    # uvloop is optional; the stdlib event loop is used when it is not installed.
+    if importlib.util.find_spec("uvloop") is None:
+        return None
+    return importlib.import_module("uvloop").new_event_loop
 
-    for batch in batches:
-        if output_fieldnames is None:
-            output_fieldnames = ensure_output_schema(
-                output_csv, list(batch[0].keys()), EXTRA_FIELDS
-            )
 
-        results = asyncio.run(
-            _process_batch(batch, max_concurrency=max_concurrency, cache=cache)
-        )
-        append_rows(output_csv, output_fieldnames, results)
-        processed_index += len(batch)
-        checkpoint_manager.save(
-            Checkpoint(
-                input_csv=str(input_csv),
-                output_csv=str(output_csv),
-                last_row_index=processed_index,
-                updated_at=time.time(),
-            )
-        )
+def run(
+    *,
+    input_csv: Path,
+    output_csv: Path,
+    batch_size: int,
+    max_concurrency: int,
+    checkpoint_dir: Path,
+    resume: bool,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    cache_dir: Optional[Path],
+    cache_ttl: int,
+    cache_clear: bool,
+    cache_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+) -> None:
+    coro = _run_async(
+        input_csv=input_csv,
+        output_csv=output_csv,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        checkpoint_dir=checkpoint_dir,
+        checkpoint_every=checkpoint_every,
+        resume=resume,
+        cache_dir=cache_dir,
+        cache_ttl=cache_ttl,
+        cache_clear=cache_clear,
+        cache_memory_entries=cache_memory_entries,
+    )
+    runner_cls = getattr(asyncio, "Runner", None)
+    if runner_cls is None:
+        # Python < 3.11 has no loop_factory hook; use the default event loop.
+        asyncio.run(coro)
+        return
+    with runner_cls(loop_factory=_loop_factory()) as loop_runner:
+        loop_runner.run(coro)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -278,9 +498,16 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--batch-size", type=int, default=200)
     parser.add_argument("--max-concurrency", type=int, default=10)
     parser.add_argument("--checkpoint-dir", type=Path, default=Path("output/checkpoints"))
+    parser.add_argument(
+        "--checkpoint-every",
+        type=_positive_int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help="Save a checkpoint every N batches (and always after the last one).",
+    )
     parser.add_argument(
         "--cache-dir",
-        default=".cache",
+        type=Path,
+        default=Path("output/cache"),
         help="Directory used to store cache files.",
     )
     parser.add_argument(
@@ -289,27 +516,31 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_CACHE_TTL_SECONDS,
         help="Cache TTL in seconds before entries are refreshed.",
     )
+    parser.add_argument(
+        "--cache-memory-entries",
+        type=int,
+        default=DEFAULT_MEMORY_ENTRIES,
+        help="Number of cache entries kept in memory in front of SQLite.",
+    )
     parser.add_argument("--resume", action="store_true")
-    parser.add_argument("--cache-dir", type=Path, default=Path("output/cache"))
-    parser.add_argument("--cache-ttl", type=int, default=60 * 60 * 24)
     parser.add_argument("--cache-clear", action="store_true")
     return parser
 
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     args = build_parser().parse_args(argv)
-    cache = CacheStore(Path(args.cache_dir), ttl_seconds=args.cache_ttl)
-    cache.prune_expired()
     run(
         input_csv=args.input_csv,
         output_csv=args.output_csv,
         batch_size=args.batch_size,
         max_concurrency=args.max_concurrency,
         checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every,
         resume=args.resume,
         cache_dir=args.cache_dir,
         cache_ttl=args.cache_ttl,
         cache_clear=args.cache_clear,
+        cache_memory_entries=args.cache_memory_entries,
     )
 
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 from pathlib import Path
 
 from rockauto_buyersguide_scraper.cache import CacheStore
@@ -39,7 +40,7 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> None:
+async def amain() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
@@ -48,30 +49,35 @@ def main() -> None:
         cache.clear()
     cache.prune_expired()
 
-    buyer_guide = fetch_buyer_guide(
-        cache=cache,
-        part_number=args.part_number,
-        part_type=args.part_type,
-        api_url=args.buyer_guide_url,
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
+
+    fetch_info_page = (
+        fetch_info_page_playwright if args.use_playwright else fetch_info_page_python
     )
-    if args.use_playwright:
-        info_page = fetch_info_page_playwright(
+    buyer_guide, info_page = await asyncio.gather(
+        fetch_buyer_guide(
             cache=cache,
             part_number=args.part_number,
             part_type=args.part_type,
-            info_url=args.info_page_url,
-        )
-    else:
-        info_page = fetch_info_page_python(
+            api_url=args.buyer_guide_url,
+        ),
+        fetch_info_page(
             cache=cache,
             part_number=args.part_number,
             part_type=args.part_type,
             info_url=args.info_page_url,
-        )
+        ),
+    )
 
     print("Buyer guide payload keys:", ", ".join(sorted(buyer_guide.payload.keys())))
     print("Info page description:", info_page.description)
 
 
+def main() -> None:
+    asyncio.run(amain())
+
+
 if __name__ == "__main__":
     main()
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import html as html_lib
 import importlib
 import importlib.util
 import json
+import re
 import urllib.request
 from dataclasses import dataclass
-from html.parser import HTMLParser
-from typing import Optional
 
 from rockauto_buyersguide_scraper.cache import CacheStore, deserialize_json, serialize_json
 
@@ -14,6 +15,18 @@ BUYER_GUIDE_CACHE_KIND = "buyer_guide_api"
 INFO_HTML_CACHE_KIND = "info_page_html"
 INFO_DESC_CACHE_KIND = "info_page_description"
 
+# Comments and script/style bodies are matched (and skipped) in the same scan,
+# as HTMLParser never reports tags inside them.
+_META_TAG_RE = re.compile(
+    r"""<!--.*?(?:-->|\Z)"""
+    r"""|<(script|style)\b(?:[^>"']|"[^"]*"|'[^']*')*>.*?(?:</\1\s*>|\Z)"""
+    r"""|<meta\b((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTRIBUTE_RE = re.compile(
+    r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?"""
+)
+
 
 @dataclass(frozen=True)
 class BuyerGuideResult:
@@ -26,25 +39,7 @@ class InfoPageResult:
     description: str
 
 
-class DescriptionParser(HTMLParser):
-    def __init__(self) -> None:
-        super().__init__()
-        self._in_meta_description = False
-        self._description: Optional[str] = None
-
-    @property
-    def description(self) -> str:
-        return self._description or ""
-
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
-        if tag != "meta":
-            return
-        attrs_dict = {key.lower(): value for key, value in attrs}
-        if attrs_dict.get("name", "").lower() == "description":
-            self._description = attrs_dict.get("content") or ""
-
-
-def fetch_buyer_guide(
+async def fetch_buyer_guide(
     cache: CacheStore,
     part_number: str,
     part_type: str,
@@ -54,13 +49,12 @@ def fetch_buyer_guide(
     if cached is not None:
         return BuyerGuideResult(payload=deserialize_json(cached.value))
 
-    with urllib.request.urlopen(api_url) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+    payload = await asyncio.to_thread(_fetch_json, api_url)
     cache.set(part_number, part_type, BUYER_GUIDE_CACHE_KIND, serialize_json(payload))
     return BuyerGuideResult(payload=payload)
 
 
-def fetch_info_page_python(
+async def fetch_info_page_python(
     cache: CacheStore,
     part_number: str,
     part_type: str,
@@ -69,17 +63,20 @@ def fetch_info_page_python(
     cached_html = cache.get(part_number, part_type, INFO_HTML_CACHE_KIND)
     cached_description = cache.get(part_number, part_type, INFO_DESC_CACHE_KIND)
     if cached_html is not None and cached_description is not None:
-        return InfoPageResult(html=cached_html.value, description=cached_description.value)
+        return InfoPageResult(
+            html=cached_html.value.decode("utf-8"),
+            description=cached_description.value.decode("utf-8"),
+        )
 
-    with urllib.request.urlopen(info_url) as response:
-        html = response.read().decode("utf-8")
+    body = await asyncio.to_thread(_fetch_bytes, info_url)
+    html = body.decode("utf-8")
     description = _parse_description(html)
-    cache.set(part_number, part_type, INFO_HTML_CACHE_KIND, html)
-    cache.set(part_number, part_type, INFO_DESC_CACHE_KIND, description)
+    cache.set(part_number, part_type, INFO_HTML_CACHE_KIND, body)
+    cache.set(part_number, part_type, INFO_DESC_CACHE_KIND, description.encode("utf-8"))
     return InfoPageResult(html=html, description=description)
 
 
-def fetch_info_page_playwright(
+async def fetch_info_page_playwright(
     cache: CacheStore,
     part_number: str,
     part_type: str,
@@ -88,27 +85,48 @@ def fetch_info_page_playwright(
     cached_html = cache.get(part_number, part_type, INFO_HTML_CACHE_KIND)
     cached_description = cache.get(part_number, part_type, INFO_DESC_CACHE_KIND)
     if cached_html is not None and cached_description is not None:
-        return InfoPageResult(html=cached_html.value, description=cached_description.value)
+        return InfoPageResult(
+            html=cached_html.value.decode("utf-8"),
+            description=cached_description.value.decode("utf-8"),
+        )
 
-    playwright_spec = importlib.util.find_spec("playwright.sync_api")
+    playwright_spec = importlib.util.find_spec("playwright")
     if playwright_spec is None:
         raise RuntimeError("Playwright is not installed. Install playwright to use this path.")
 
-    sync_api = importlib.import_module("playwright.sync_api")
-    with sync_api.sync_playwright() as playwright:
-        browser = playwright.chromium.launch()
-        page = browser.new_page()
-        page.goto(info_url)
-        html = page.content()
-        browser.close()
+    async_api = importlib.import_module("playwright.async_api")
+    async with async_api.async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        page = await browser.new_page()
+        await page.goto(info_url)
+        html = await page.content()
+        await browser.close()
 
     description = _parse_description(html)
-    cache.set(part_number, part_type, INFO_HTML_CACHE_KIND, html)
-    cache.set(part_number, part_type, INFO_DESC_CACHE_KIND, description)
+    cache.set(part_number, part_type, INFO_HTML_CACHE_KIND, html.encode("utf-8"))
+    cache.set(part_number, part_type, INFO_DESC_CACHE_KIND, description.encode("utf-8"))
     return InfoPageResult(html=html, description=description)
 
 
+def _fetch_bytes(url: str) -> bytes:
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def _fetch_json(url: str) -> dict:
+    return json.loads(_fetch_bytes(url).decode("utf-8"))
+
+
 def _parse_description(html: str) -> str:
-    parser = DescriptionParser()
-    parser.feed(html)
-    return parser.description
+    description = ""
+    for match in _META_TAG_RE.finditer(html):
+        raw_attrs = match.group(2)
+        if raw_attrs is None or "description" not in raw_attrs.lower():
+            continue
+        attrs = {
+            name.lower(): "".join(values)
+            for name, *values in _ATTRIBUTE_RE.findall(raw_attrs)
+        }
+        if attrs.get("name", "").lower() == "description":
+            description = html_lib.unescape(attrs.get("content", ""))
+    return description
@@ -1,31 +1,121 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
+import enum
+import importlib
+import importlib.util
 import json
+import math
 import sys
+import time
+import uuid
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import Any, Dict
+from datetime import date, datetime, time as dt_time, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+_orjson = importlib.import_module("orjson") if importlib.util.find_spec("orjson") else None
+
+_RESERVED_KEYS = frozenset(("timestamp", "level", "message"))
+_MAX_CACHED_HEADS = 1024
+_FLUSH_NOW_LEVELS = frozenset(("error", "critical"))
 
 
 @dataclass
 class Logger:
     stream: Any = sys.stdout
     default_fields: Dict[str, Any] = field(default_factory=dict)
+    flush_every: int = 64
+    flush_interval: float = 1.0
+    _buffer: List[str] = field(default_factory=list, init=False, repr=False)
+    _last_flush: float = field(default_factory=time.monotonic, init=False, repr=False)
+    _last_second: int = field(default=-1, init=False, repr=False)
+    _last_prefix: str = field(default="", init=False, repr=False)
+    _defaults_fragment: Optional[str] = field(default=None, init=False, repr=False)
+    _template_keys: FrozenSet[str] = field(default=_RESERVED_KEYS, init=False, repr=False)
+    _heads: Dict[Tuple[str, str], str] = field(default_factory=dict, init=False, repr=False)
+    _encoded_defaults: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._encode_defaults()
+
+    def _encode_defaults(self) -> None:
+        # default_fields is encoded once and reused with the cached level/message
+        # head; lines that would repeat a key fall back to building the full
+        # payload dict so later values still win. log() re-encodes whenever
+        # default_fields stops comparing equal to the deep snapshot taken here,
+        # so in-place changes to nested values are picked up too. Values that
+        # cannot be deep-copied keep the logger on the dict path, which always
+        # reads the live values.
+        self._template_keys = _RESERVED_KEYS | frozenset(self.default_fields)
+        self._heads.clear()
+        self._defaults_fragment = None
+        try:
+            self._encoded_defaults = copy.deepcopy(self.default_fields)
+        except Exception:
+            self._encoded_defaults = self.default_fields
+            return
+        if _RESERVED_KEYS.isdisjoint(self.default_fields):
+            try:
+                self._defaults_fragment = _fields_fragment(self.default_fields)
+            except (TypeError, ValueError):
+                self._defaults_fragment = None
 
     def _timestamp(self) -> str:
-        return datetime.now(timezone.utc).isoformat()
+        seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+        if seconds != self._last_second:
+            self._last_second = seconds
+            self._last_prefix = datetime.fromtimestamp(seconds, timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            )
+        return f"{self._last_prefix}.{nanoseconds // 1000:06d}+00:00"
 
     def log(self, level: str, message: str, **fields: Any) -> None:
-        payload = {
-            "timestamp": self._timestamp(),
-            "level": level.upper(),
-            "message": message,
-            **self.default_fields,
-            **fields,
-        }
-        json.dump(payload, self.stream, ensure_ascii=False)
-        self.stream.write("\n")
+        if self.default_fields != self._encoded_defaults:
+            self._encode_defaults()
+        fragment = self._defaults_fragment
+        if fragment is None or not self._template_keys.isdisjoint(fields):
+            payload = {
+                "timestamp": self._timestamp(),
+                "level": level.upper(),
+                "message": message,
+                **self.default_fields,
+                **fields,
+            }
+            self._buffer.append(_dumps(payload) + "\n")
+        else:
+            head = self._heads.get((level, message))
+            if head is None:
+                head = f'","level":{_dumps(level.upper())},"message":{_dumps(message)}{fragment}'
+                if len(self._heads) < _MAX_CACHED_HEADS:
+                    self._heads[(level, message)] = head
+            self._buffer.append(
+                '{"timestamp":"' + self._timestamp() + head + _fields_fragment(fields) + "}\n"
+            )
+        # Errors are written straight away, and a slow trickle of lines is
+        # still flushed at least every flush_interval seconds.
+        if (
+            len(self._buffer) >= self.flush_every
+            or level.lower() in _FLUSH_NOW_LEVELS
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
         self.stream.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __del__(self) -> None:
+        try:
+            self.flush()
+        except (AttributeError, ValueError):
+            pass
 
     def info(self, message: str, **fields: Any) -> None:
         self.log("info", message, **fields)
@@ -35,3 +125,57 @@ class Logger:
 
     def error(self, message: str, **fields: Any) -> None:
         self.log("error", message, **fields)
+
+
+def _dumps(payload: Any) -> str:
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(payload, option=_orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    try:
+        return _json_dumps(payload)
+    except ValueError:
+        return _json_dumps(_finite(payload))
+
+
+# The stdlib fallback mirrors orjson's output: the same native types are
+# accepted and non-finite floats become null instead of NaN/Infinity.
+def _json_dumps(payload: Any) -> str:
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=False,
+        default=_json_default,
+    )
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _finite(_json_default(value))
+    return value
+
+
+def _fields_fragment(fields: Dict[str, Any]) -> str:
+    if not fields:
+        return ""
+    return "," + _dumps(fields)[1:-1]
@@ -36,61 +36,51 @@ class PartRunner:
         processor: Callable[[PartT], PartOutcome],
     ) -> RunSummary:
         summary = RunSummary()
-        for part in parts:
-            summary.total += 1
-            part_label = str(part)
-            self.logger.info("part.start", part=part_label)
-            start_time = time.monotonic()
-            try:
-                outcome = processor(part)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                duration_ms = (time.monotonic() - start_time) * 1000
-                summary.failures += 1
-                self.logger.error(
-                    "part.failure",
-                    part=part_label,
-                    duration_ms=round(duration_ms, 3),
-                    error=str(exc),
-                )
-                continue
+        # Flush on every exit so buffered lines survive an interrupted run.
+        try:
+            for part in parts:
+                summary.total += 1
+                part_label = str(part)
+                self.logger.info("part.start", part=part_label)
+                start_ns = time.monotonic_ns()
+                try:
+                    outcome = processor(part)
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    summary.failures += 1
+                    self.logger.error(
+                        "part.failure",
+                        part=part_label,
+                        duration_ms=(time.monotonic_ns() - start_ns) / 1_000_000,
+                        error=str(exc),
+                    )
+                    continue
 
-            duration_ms = (time.monotonic() - start_time) * 1000
-            summary.retries += outcome.retries
-            summary.cache_hits += int(outcome.cache_hit)
+                payload = {
+                    "part": part_label,
+                    "duration_ms": (time.monotonic_ns() - start_ns) / 1_000_000,
+                    "retries": outcome.retries,
+                    "cache_hit": outcome.cache_hit,
+                }
+                summary.retries += outcome.retries
+                summary.cache_hits += int(outcome.cache_hit)
 
-            if outcome.success:
-                summary.successes += 1
-                self.logger.info(
-                    "part.success",
-                    part=part_label,
-                    duration_ms=round(duration_ms, 3),
-                    retries=outcome.retries,
-                    cache_hit=outcome.cache_hit,
-                )
-            else:
-                summary.failures += 1
-                self.logger.error(
-                    "part.failure",
-                    part=part_label,
-                    duration_ms=round(duration_ms, 3),
-                    retries=outcome.retries,
-                    cache_hit=outcome.cache_hit,
-                    reason=outcome.failure_reason,
-                )
+                # Retries are reported on the outcome record rather than a separate line.
+                if outcome.success:
+                    summary.successes += 1
+                    self.logger.info("part.success", **payload)
+                else:
+                    summary.failures += 1
+                    payload["reason"] = outcome.failure_reason
+                    self.logger.error("part.failure", **payload)
 
-            if outcome.retries:
-                self.logger.warning(
-                    "part.retries",
-                    part=part_label,
-                    retries=outcome.retries,
-                )
-
-        self.logger.info(
-            "run.summary",
-            total=summary.total,
-            successes=summary.successes,
-            failures=summary.failures,
-            retries=summary.retries,
-            cache_hits=summary.cache_hits,
-        )
+            self.logger.info(
+                "run.summary",
+                total=summary.total,
+                successes=summary.successes,
+                failures=summary.failures,
+                retries=summary.retries,
+                cache_hits=summary.cache_hits,
+            )
+        finally:
+            self.logger.flush()
         return summary